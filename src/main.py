@@ -1,41 +1,40 @@
 """
 This script coordinates the retrieval of a document from Overleaf and its subsequent upload to SharePoint.
 It uses the configurations specified in 'config.py' for logging and environment variables to handle credentials and URLs.
-The `main` function orchestrates the process, logging each major step.
+The `main` coroutine orchestrates the process, logging each major step.
 """
 
+import asyncio
 import logging
 import os
 
 from config import LOGGING_BASIC_CONFIG
-from overleaf import get_document_bytes
-from sharepoint import upload_document_to_sharepoint
+from session import PlaywrightSession
 
 logging.basicConfig(**LOGGING_BASIC_CONFIG)
 
 
-def main():
+async def main():
     """
-    Main function to download a document from Overleaf and upload it to SharePoint.
+    Main coroutine to download a document from Overleaf and upload it to SharePoint.
 
-    It retrieves the document from Overleaf using the URL from environment variables,
-    logs the process, and then uploads the document to SharePoint with the credentials
-    and URL also specified in the environment variables.
+    It opens a `PlaywrightSession` (one Playwright driver, one Chromium launch) and runs the fused
+    transfer pipeline: the Overleaf download proceeds concurrently with the SharePoint warmup, and the
+    document bytes are handed to the already-prepared SharePoint page by reference for upload.
     """
-    logging.info("---OVERLEAF STARTING---")
-    name, content = get_document_bytes(os.getenv("OVERLEAF_URL"))
-    logging.info("---OVERLEAF FINISHED---")
-
-    logging.info("---SHAREPOINT STARTING---")
-    upload_document_to_sharepoint(
-        file_name=name,
-        file_bytes=content,
-        sharepoint_url=os.getenv("SHAREPOINT_URL"),
-        username=os.getenv("MICROSOFT_USERNAME"),
-        password=os.getenv("MICROSOFT_PASSWORD"),
-    )
-    logging.info("---SHAREPOINT FINISHED---")
+    session = await PlaywrightSession.start()
+    try:
+        logging.info("---TRANSFER STARTING---")
+        name = await session.transfer(
+            overleaf_url=os.getenv("OVERLEAF_URL"),
+            sharepoint_url=os.getenv("SHAREPOINT_URL"),
+            username=os.getenv("MICROSOFT_USERNAME"),
+            password=os.getenv("MICROSOFT_PASSWORD"),
+        )
+        logging.info("---TRANSFER OF '%s' FINISHED---", name)
+    finally:
+        await session.aclose()
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
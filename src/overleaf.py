@@ -22,29 +22,105 @@ Example Usage:
 
 """
 
+import asyncio
+import logging
+import hashlib
+import json
 import os
-import tempfile
-from typing import Tuple
+import pathlib
+from typing import Optional, Tuple
 
-from playwright.sync_api import sync_playwright
+import requests
+from playwright.async_api import async_playwright
 
 from config import *
+from routing import abort_nonessential_requests
 
 RENDER_TIMEOUT = 61_000
 URL = os.getenv("OVERLEAF_URL")
 
-logging.basicConfig(**LOGGING_BASIC_CONFIG)
+# CSS selectors, matched by the browser's native engine rather than the XPath shim.
+CANVAS_CSS = "div.canvasWrapper"
+DOWNLOAD_BUTTON_CSS = "i.fa-download"
 
+# On-disk cache of rendered PDFs, keyed by the share link plus the validator
+# header from a cheap HEAD request. A hit skips the whole browser path.
+CACHE_DIR = pathlib.Path(
+    os.getenv("OVERLEAF_CACHE_DIR", os.path.expanduser("~/.cache/overleaf_to_sharepoint"))
+)
+CACHE_MAX_ENTRIES = 8
+HEAD_TIMEOUT = 10
 
-def get_document_bytes(overleaf_url: str) -> Tuple[str, bytes]:
+logger = logging.getLogger(__name__)
+
+
+def _cache_key(overleaf_url: str) -> Optional[str]:
+    """
+    Derives a cache key for the share link from a cheap HEAD request.
+
+    The key combines the URL with the response's ETag (or Last-Modified) header. The validator is
+    only trusted when the response body is the PDF itself (Content-Type application/pdf): a
+    validator on the share page's HTML shell tracks that HTML, not the compiled output, so a stale
+    PDF could be served after the project changed. Returns None when the request fails, the
+    response is not a PDF, or no validator header is present — in all of which cases caching is
+    skipped and the document is rendered afresh.
+    """
+    try:
+        response = requests.head(overleaf_url, allow_redirects=True, timeout=HEAD_TIMEOUT)
+    except requests.RequestException:
+        logger.info("HEAD request for %s failed, skipping cache", overleaf_url)
+        return None
+    content_type = response.headers.get("Content-Type", "")
+    if "application/pdf" not in content_type:
+        logger.info(
+            "HEAD response for %s has Content-Type %r, not a PDF; its validator does not "
+            "track the compiled output, skipping cache",
+            overleaf_url,
+            content_type,
+        )
+        return None
+    validator = response.headers.get("ETag") or response.headers.get("Last-Modified")
+    if validator is None:
+        return None
+    return hashlib.sha256((overleaf_url + validator).encode()).hexdigest()
+
+
+def _cache_load(key: str) -> Optional[Tuple[str, bytes]]:
+    """Returns the cached (filename, bytes) pair for the key, or None on a miss."""
+    meta_path = CACHE_DIR / f"{key}.json"
+    pdf_path = CACHE_DIR / f"{key}.pdf"
+    if not (meta_path.exists() and pdf_path.exists()):
+        return None
+    with open(meta_path, "r") as meta_file:
+        name = json.load(meta_file)["name"]
+    document_bytes = pdf_path.read_bytes()
+    # Refresh the mtime so pruning evicts least-recently-used entries first.
+    os.utime(pdf_path)
+    return name, document_bytes
+
+
+def _cache_store(key: str, name: str, document_bytes: bytes) -> None:
+    """Stores the (filename, bytes) pair under the key and prunes old entries."""
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    (CACHE_DIR / f"{key}.pdf").write_bytes(document_bytes)
+    with open(CACHE_DIR / f"{key}.json", "w") as meta_file:
+        json.dump({"name": name}, meta_file)
+    pdfs = sorted(CACHE_DIR.glob("*.pdf"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for stale in pdfs[CACHE_MAX_ENTRIES:]:
+        stale.with_suffix(".json").unlink(missing_ok=True)
+        stale.unlink(missing_ok=True)
+
+
+async def get_document_bytes(browser, overleaf_url: str) -> Tuple[str, bytes]:
     """
     Retrieves the PDF document from an Overleaf project as a bytes object.
 
-    This function automates the process of downloading the output PDF from an Overleaf project using a headless
-    Chromium browser instance. It navigates to the given Overleaf URL, waits for the project's canvas to load,
-    and then triggers the download by clicking the appropriate button.
+    When the project is unchanged since a previous run (as judged by the share link's validator
+    headers), the PDF is served from the on-disk cache and the browser is never involved. Otherwise
+    the document is rendered and downloaded via `_render_document_bytes` and the cache is refreshed.
 
     Args:
+        browser: The launched Playwright browser in which to open a new context.
         overleaf_url (str): The URL of the Overleaf project from which to download the PDF.
 
     Returns:
@@ -55,31 +131,64 @@ def get_document_bytes(overleaf_url: str) -> Tuple[str, bytes]:
         The Overleaf URL should be a read-only share link to ensure that the document can be accessed without
         needing to log in, and that it cannot be accidentally modified.
     """
-    with sync_playwright() as p:
-        logging.info("Launching Chromium browser instance")
-        browser = p.chromium.launch(headless=HEADLESS)
-        page = browser.new_page()
-        logging.info("Navigating to Overleaf URL %s", overleaf_url)
-        page.goto(overleaf_url)
-        canvas_xpath = """//div[@class='canvasWrapper']"""
-        logging.info(
+    cache_key = await asyncio.to_thread(_cache_key, overleaf_url)
+    if cache_key is not None:
+        cached = _cache_load(cache_key)
+        if cached is not None:
+            logger.info(
+                "Cache hit for %s, serving PDF without a browser download", overleaf_url
+            )
+            return cached
+    name, document_bytes = await _render_document_bytes(browser, overleaf_url)
+    if cache_key is not None:
+        _cache_store(cache_key, name, document_bytes)
+    return name, document_bytes
+
+
+async def _render_document_bytes(browser, overleaf_url: str) -> Tuple[str, bytes]:
+    """
+    Renders and downloads the project's output PDF in a dedicated browser context.
+
+    This function automates the process of downloading the output PDF from an Overleaf project.
+    It navigates to the given Overleaf URL, waits for the project's canvas to load,
+    and then triggers the download by clicking the appropriate button.
+
+    Args:
+        browser: The launched Playwright browser in which to open a new context.
+        overleaf_url (str): The URL of the Overleaf project from which to download the PDF.
+
+    Returns:
+        str: The filename of the downloaded PDF.
+        bytes: The content of the PDF document in bytes.
+    """
+    logger.info("Opening new browser context for Overleaf")
+    context = await browser.new_context()
+    # The browser is shared and long-lived, so the context must be torn down even
+    # when the navigation, render wait, or download fails.
+    try:
+        page = await context.new_page()
+        await page.route("**/*", abort_nonessential_requests)
+        logger.info("Navigating to Overleaf URL %s", overleaf_url)
+        # "load" rather than "networkidle": the canvas appearing is the real readiness
+        # signal, and networkidle is flaky on pages with long-polling connections.
+        await page.goto(overleaf_url, wait_until="load")
+        logger.info(
             "Waiting for canvas to load (i.e. for the LaTeX to render). This may take a while..."
         )
         page.set_default_timeout(RENDER_TIMEOUT)
-        page.wait_for_selector(canvas_xpath)
-        download_button_xpath = r"//i[contains(@class, 'fa-download')]"
-        with page.expect_download() as download_info:
-            logging.info("Clicking download button")
-            page.click(download_button_xpath)
-        download = download_info.value
-        with tempfile.TemporaryDirectory() as download_buffer:
-            path = os.path.join(download_buffer, download.suggested_filename)
-            logging.info("Saving PDF to %s", path)
-            download.save_as(path)
-            browser.close()
-            with open(path, "rb") as downloaded_file:
-                document_bytes = downloaded_file.read()
-    logging.info(
+        await page.locator(CANVAS_CSS).first.wait_for()
+        async with page.expect_download() as download_info:
+            logger.info("Clicking download button")
+            await page.locator(DOWNLOAD_BUTTON_CSS).first.click()
+        download = await download_info.value
+        # Read the temp file Playwright already wrote for the download instead of
+        # copying it elsewhere with save_as first.
+        download_path = pathlib.Path(await download.path())
+        logger.info("Reading downloaded PDF from %s", download_path)
+        document_bytes = download_path.read_bytes()
+    finally:
+        await context.close()
+    logger.info(
         "Successfully retrieved PDF document '%s' of size %d bytes",
         download.suggested_filename,
         len(document_bytes),
@@ -88,6 +197,17 @@ def get_document_bytes(overleaf_url: str) -> Tuple[str, bytes]:
 
 
 if __name__ == "__main__":
-    document_name, downloaded_document = get_document_bytes(overleaf_url=URL)
+
+    async def _debug_download() -> Tuple[str, bytes]:
+        async with async_playwright() as playwright:
+            browser = await playwright.chromium.launch(
+                headless=HEADLESS, args=BROWSER_LAUNCH_ARGS, chromium_sandbox=False
+            )
+            try:
+                return await get_document_bytes(browser, overleaf_url=URL)
+            finally:
+                await browser.close()
+
+    document_name, downloaded_document = asyncio.run(_debug_download())
     with open("document.pdf", "wb") as debug_output_file:
         debug_output_file.write(downloaded_document)
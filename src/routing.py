@@ -0,0 +1,37 @@
+"""
+This module provides a shared request-routing handler for the Overleaf and SharePoint pages.
+
+Both sites pull in assets that are irrelevant to the automation's goals (waiting for the render
+canvas, clicking the upload button): hero images, web fonts, media, and third-party analytics SDKs.
+Aborting those requests before navigation removes their network, parse, and layout cost from every
+run. Requests the automation depends on — documents, scripts, stylesheets, and the xhr/fetch traffic
+that produces the PDF and performs the upload — are always allowed through.
+
+Functions:
+- abort_nonessential_requests: Route handler to install with `page.route("**/*", ...)`.
+"""
+
+# Resource types that never contribute to the automation's readiness signals.
+BLOCKED_RESOURCE_TYPES = ("image", "font", "media")
+# Third-party analytics and tracking domains neither site needs to function.
+BLOCKED_URL_FRAGMENTS = ("google-analytics", "doubleclick", "hotjar", "segment")
+
+
+async def abort_nonessential_requests(route) -> None:
+    """
+    Aborts requests for non-essential assets and lets everything else continue.
+
+    Install with `page.route("**/*", abort_nonessential_requests)` before navigating. Blocks
+    images, fonts, and media by resource type, plus known analytics endpoints by URL; xhr/fetch
+    traffic is never blocked so PDF production and uploads are unaffected.
+
+    :param route: The Playwright route object for the intercepted request.
+    :return: None. The request is either aborted or continued.
+    """
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or any(
+        fragment in request.url for fragment in BLOCKED_URL_FRAGMENTS
+    ):
+        await route.abort()
+    else:
+        await route.continue_()
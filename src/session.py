@@ -0,0 +1,139 @@
+"""
+This module provides a long-lived Playwright session for processes that handle many documents.
+
+Browser launch is the most expensive Playwright operation, so a scheduled worker that re-launched
+Chromium per document would spend most of its time in startup. `PlaywrightSession` owns the Playwright
+driver and a single Chromium instance for its whole lifetime, and exposes the Overleaf download and
+SharePoint upload steps as methods that each open a fresh, cheap browser context.
+
+Usage:
+    session = await PlaywrightSession.start()
+    try:
+        await session.transfer(overleaf_url, sharepoint_url, username, password)
+    finally:
+        await session.aclose()
+"""
+
+import asyncio
+import logging
+
+from playwright.async_api import async_playwright
+
+from config import *
+from overleaf import get_document_bytes
+from sharepoint import prepare_sharepoint_page, upload_document_to_sharepoint
+
+logger = logging.getLogger(__name__)
+
+
+class PlaywrightSession:
+    """
+    Owns a running Playwright driver and a single launched Chromium browser.
+
+    Create instances with the `start` classmethod and dispose of them with `aclose`. The browser is
+    shared across all operations on the session; each operation isolates itself in its own browser
+    context, so a session can safely serve many download/upload cycles back to back.
+    """
+
+    def __init__(self, playwright, browser):
+        self._playwright = playwright
+        self._browser = browser
+
+    @classmethod
+    async def start(cls) -> "PlaywrightSession":
+        """
+        Starts the Playwright driver, launches Chromium, and returns the ready session.
+
+        :return: A `PlaywrightSession` holding the running driver and launched browser.
+        """
+        playwright = await async_playwright().start()
+        logger.info("Launching Chromium browser instance")
+        browser = await playwright.chromium.launch(
+            headless=HEADLESS, args=BROWSER_LAUNCH_ARGS, chromium_sandbox=False
+        )
+        return cls(playwright, browser)
+
+    async def download_overleaf(self, overleaf_url: str):
+        """
+        Downloads the rendered PDF of an Overleaf project in a fresh browser context.
+
+        :param overleaf_url: The Overleaf read-only share link to download from.
+        :return: A tuple of the PDF filename and its byte content.
+        """
+        return await get_document_bytes(self._browser, overleaf_url)
+
+    async def prepare_sharepoint(self, sharepoint_url: str, username: str, password: str):
+        """
+        Prepares a logged-in SharePoint page in a fresh browser context.
+
+        :param sharepoint_url: The URL of the SharePoint site where documents will be uploaded.
+        :param username: The username (usually an email) for logging into SharePoint.
+        :param password: The password associated with the username.
+        :return: A tuple of the new browser context and the prepared page.
+        """
+        return await prepare_sharepoint_page(
+            self._browser, sharepoint_url, username, password
+        )
+
+    async def upload_sharepoint(self, page, file_name: str, file_bytes: bytes) -> None:
+        """
+        Uploads a document on a page previously returned by `prepare_sharepoint`.
+
+        :param page: The prepared SharePoint page.
+        :param file_name: The name of the file to be uploaded.
+        :param file_bytes: The binary content of the file to be uploaded.
+        :return: None.
+        """
+        await upload_document_to_sharepoint(page, file_name, file_bytes)
+
+    async def transfer(
+        self, overleaf_url: str, sharepoint_url: str, username: str, password: str
+    ) -> str:
+        """
+        Moves one document from Overleaf to SharePoint as a single fused pipeline.
+
+        The Overleaf download runs concurrently with the SharePoint warmup, and the downloaded bytes
+        object is handed to the upload by reference — it is never copied, serialized, or written to
+        disk between the two phases.
+
+        :param overleaf_url: The Overleaf read-only share link to download from.
+        :param sharepoint_url: The URL of the SharePoint site to upload to.
+        :param username: The username (usually an email) for logging into SharePoint.
+        :param password: The password associated with the username.
+        :return: The filename of the transferred document.
+        """
+        # Let both tasks run to completion even when one fails: the prepared
+        # SharePoint context must be closed rather than leaked into the shared
+        # long-lived browser when its sibling task raises.
+        download_result, prepare_result = await asyncio.gather(
+            self.download_overleaf(overleaf_url),
+            self.prepare_sharepoint(sharepoint_url, username, password),
+            return_exceptions=True,
+        )
+        if isinstance(download_result, BaseException) or isinstance(
+            prepare_result, BaseException
+        ):
+            if not isinstance(prepare_result, BaseException):
+                context, _ = prepare_result
+                await context.close()
+            raise next(
+                result
+                for result in (download_result, prepare_result)
+                if isinstance(result, BaseException)
+            )
+        (name, content), (context, page) = download_result, prepare_result
+        try:
+            await self.upload_sharepoint(page, name, content)
+        finally:
+            await context.close()
+        return name
+
+    async def aclose(self) -> None:
+        """
+        Closes the browser and stops the Playwright driver.
+
+        :return: None.
+        """
+        logger.info("Closing browser and stopping Playwright")
+        await self._browser.close()
+        await self._playwright.stop()
@@ -3,13 +3,17 @@ This module provides functionality to automate the process of uploading document
 It utilizes the Playwright library to interact with web pages, simulating a user logging in to SharePoint with credentials
 and uploading a file.
 
-The main function `upload_document_to_sharepoint` takes in file information and user credentials, handles the login process if necessary,
-and uploads the file to the specified SharePoint URL. It uses a helper function `log_in` to perform the actual login steps.
+The warmup function `prepare_sharepoint_page` launches the browser, restores the cookie session, navigates to the
+SharePoint URL, and logs in with the provided credentials if necessary. It can run concurrently with the Overleaf
+download so the page is ready by the time the document bytes arrive. `upload_document_to_sharepoint` then uploads
+the file to the already-prepared page. A helper function `log_in` performs the actual login steps.
 
-A cookie file is used to store and reuse login session information to avoid logging in multiple times.
+A storage state file is used to store and reuse login session information (cookies and localStorage, where
+Microsoft keeps its auth tokens) to avoid logging in multiple times.
 The Playwright browser context is set to headless mode by default, meaning it runs in the background without opening a visible window.
 
 Functions:
+- prepare_sharepoint_page: Launches the browser and readies a logged-in SharePoint page.
 - upload_document_to_sharepoint: Automates the document upload process to SharePoint.
 - log_in: Helper function to perform the login action on a Microsoft account page.
 
@@ -18,110 +22,147 @@ To use this module, set the required environment variables for SharePoint URL, u
 The document to be uploaded should be specified as a file name and its byte content.
 """
 
-import json
+import asyncio
+import logging
 import os
-from tempfile import TemporaryDirectory
-from time import time
+from time import time_ns
 
-from playwright.sync_api import sync_playwright
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from playwright.async_api import async_playwright
 
 from config import *
+from routing import abort_nonessential_requests
 
-logging.basicConfig(**LOGGING_BASIC_CONFIG)
+logger = logging.getLogger(__name__)
 
 URL = os.getenv("SHAREPOINT_URL")
 USERNAME = os.getenv("MICROSOFT_USERNAME")
 PASSWORD = os.getenv("MICROSOFT_PASSWORD")
 COOKIES_FILE = os.getenv("COOKIES_FILE")
 
+# CSS selectors, matched by the browser's native engine rather than the XPath shim.
+EMAIL_INPUT_CSS = "input[type='email']"
+PASSWORD_INPUT_CSS = "input[type='password']"
+SUBMIT_BUTTON_CSS = "input[type='submit']"
+# Either login field present means the stored session was not enough.
+LOGIN_FIELDS_CSS = f"{EMAIL_INPUT_CSS}, {PASSWORD_INPUT_CSS}"
+UPLOAD_BUTTON_CSS = "i[data-icon-name='upload']"
+FILES_MENU_ITEM_CSS = "li[role='presentation'] span:has-text('Files')"
 
-def upload_document_to_sharepoint(
-    file_name: str, file_bytes: bytes, sharepoint_url: str, username: str, password: str
-) -> None:
+# How long to wait for each login form stage before assuming it was skipped
+# (e.g. single-factor tenants, or a session that only needs a refresh).
+LOGIN_STEP_TIMEOUT = 5_000
+
+
+def _is_upload_response(response) -> bool:
+    """Matches the SharePoint upload request completing successfully."""
+    return "upload" in response.url.lower() and response.status in (200, 201, 204)
+
+
+async def prepare_sharepoint_page(browser, sharepoint_url: str, username: str, password: str):
     """
-    Uploads a document to SharePoint using provided credentials.
+    Prepares a logged-in SharePoint page in a dedicated browser context, ready for uploads.
 
-    This function automates the process of logging into SharePoint and uploading a document using Playwright.
-    It checks if the login page is present, and if so, it will log in using the provided credentials.
-    Then it uploads the file by creating a temporary file from the provided bytes and handling the file chooser.
+    This function restores the saved session (cookies and localStorage), navigates to the SharePoint URL, and
+    performs the login flow if a login form is presented. It is intended to run concurrently with the Overleaf
+    download so that the SharePoint page is already warm when the document bytes become available.
 
-    :param file_name: The name of the file to be uploaded.
-    :param file_bytes: The binary content of the file to be uploaded.
+    :param browser: The launched Playwright browser in which to open a new context.
     :param sharepoint_url: The URL of the SharePoint site where the document will be uploaded.
     :param username: The username (usually an email) for logging into SharePoint.
     :param password: The password associated with the username for logging into SharePoint.
+    :return: A tuple of the new browser context and the prepared page.
+    """
+    logger.info("Opening new browser context for SharePoint")
+    if os.path.exists(COOKIES_FILE):
+        logger.info("Restoring session from storage state file %s", COOKIES_FILE)
+        context = await browser.new_context(storage_state=COOKIES_FILE)
+    else:
+        logger.info("No storage state file at %s, starting a fresh session", COOKIES_FILE)
+        context = await browser.new_context()
+    # The context is returned open for the upload, but must not leak into the
+    # shared, long-lived browser when the navigation or login fails.
+    try:
+        page = await context.new_page()
+        await page.route("**/*", abort_nonessential_requests)
+        logger.info("Navigating to SharePoint URL %s", sharepoint_url)
+        await page.goto(sharepoint_url)
+        if await page.locator(LOGIN_FIELDS_CSS).count() > 0:
+            await log_in(page, password, username)
+    except Exception:
+        await context.close()
+        raise
+    return context, page
+
+
+async def upload_document_to_sharepoint(page, file_name: str, file_bytes: bytes) -> None:
+    """
+    Uploads a document to SharePoint on an already-prepared page.
+
+    This function uploads the file by handing the provided bytes to the file chooser on the given page as an
+    in-memory payload. The page is expected to have been prepared by `prepare_sharepoint_page`.
+
+    :param page: The Playwright page object pointed at the SharePoint site, already logged in.
+    :param file_name: The name of the file to be uploaded.
+    :param file_bytes: The binary content of the file to be uploaded.
     :return: None. The function performs actions but does not return any value.
     """
-    with open(COOKIES_FILE, "r") as cookies_file:
-        logging.info("Loading cookies from file")
-        cookies = json.load(cookies_file)
-        logging.info("Loaded %d cookies", len(cookies))
-
-    with sync_playwright() as p:
-        logging.info("Launching Chromium browser instance")
-        browser = p.chromium.launch(headless=HEADLESS)
-        context = browser.new_context()
-        logging.info("Setting cookies")
-        context.add_cookies(cookies)
-        page = context.new_page()
-        logging.info("Navigating to SharePoint URL %s", sharepoint_url)
-        page.goto(sharepoint_url)
-        if (
-            page.query_selector("""//input[@type='password']""") is not None
-            or page.query_selector("""//input[@type='email']""") is not None
-        ):
-            log_in(page, password, username)
-        page.click("""//i[@data-icon-name='upload']""")
-        with TemporaryDirectory() as upload_buffer:
-            new_file_name = file_name.replace(".pdf", f"-{int(time())}.pdf")
-            path = os.path.join(upload_buffer, new_file_name)
-            with open(path, "wb") as upload_file:
-                upload_file.write(file_bytes)
-            logging.info("Uploading file %s", path)
-            with page.expect_file_chooser() as fc_info:
-                page.click(
-                    """//li[@role='presentation']//span[contains(text(),'Files')]"""
-                )
-            file_chooser = fc_info.value
-            file_chooser.set_files(path)
-
-        page.wait_for_selector("""//div[contains(text(),'Uploaded')]""")
-        logging.info("File uploaded successfully")
-        logging.info("Saving cookies to file")
-        with open(COOKIES_FILE, "w") as cookies_file:
-            json.dump(page.context.cookies(), cookies_file)
-            logging.info("Saved %d cookies", len(page.context.cookies()))
-        logging.info("Closing browser")
-        browser.close()
-
-
-def log_in(page, password: str, username: str):
+    await page.locator(UPLOAD_BUTTON_CSS).click()
+    stem, suffix = os.path.splitext(file_name)
+    new_file_name = f"{stem}-{time_ns()}{suffix}"
+    logger.info("Uploading file %s", new_file_name)
+    async with page.expect_file_chooser() as fc_info:
+        await page.locator(FILES_MENU_ITEM_CSS).first.click()
+    file_chooser = await fc_info.value
+    # Wait on the upload request succeeding rather than polling the DOM for the
+    # "Uploaded" banner, which only appears some time after the server responds.
+    async with page.expect_response(_is_upload_response):
+        await file_chooser.set_files(
+            {"name": new_file_name, "mimeType": "application/pdf", "buffer": file_bytes}
+        )
+    logger.info("File uploaded successfully")
+    logger.info("Saving storage state to %s", COOKIES_FILE)
+    await page.context.storage_state(path=COOKIES_FILE)
+
+
+async def log_in(page, password: str, username: str):
     """
     Performs login action on a Microsoft account within a Playwright page.
 
     The function fills in the username and password on the login form, and submits the form to log into the account.
     It is intended to be used for automation tasks where a Microsoft login is required, such as interacting with SharePoint.
+    Each form stage is given a short timeout; a stage that never appears (e.g. when the session only needed a
+    refresh) is skipped rather than treated as an error.
 
     :param page: The Playwright page object in which the login interaction takes place.
     :param username: The username (usually an email) for the Microsoft account.
     :param password: The password for the Microsoft account.
     :return: None. The function performs actions but does not return any value.
     """
-    if page.query_selector("""//input[@type='email']""") is None:
-        page.fill("""//input[@type='email']""", username)
-        page.click("""//input[@type='submit']""")
-    if page.query_selector("""//input[@type='password']""") is None:
-        page.fill("""//input[@type='password']""", password)
-        page.click("""//input[@type='submit']""")
-    ...
-    # save cookies
-    with open(COOKIES_FILE, "w") as cookies_file:
-        logging.info("Saving cookies to file")
-        json.dump(page.context.cookies(), cookies_file)
-        logging.info("Saved %d cookies", len(page.context.cookies()))
+    try:
+        await page.locator(EMAIL_INPUT_CSS).fill(username, timeout=LOGIN_STEP_TIMEOUT)
+        await page.locator(SUBMIT_BUTTON_CSS).click(timeout=LOGIN_STEP_TIMEOUT)
+    except PlaywrightTimeoutError:
+        logger.info("Email stage not presented, skipping")
+    try:
+        await page.locator(PASSWORD_INPUT_CSS).fill(password, timeout=LOGIN_STEP_TIMEOUT)
+        await page.locator(SUBMIT_BUTTON_CSS).click(timeout=LOGIN_STEP_TIMEOUT)
+    except PlaywrightTimeoutError:
+        logger.info("Password stage not presented, skipping")
 
 
 if __name__ == "__main__":
-    filename = str()
-    document_bytes = bytes()
-    upload_document_to_sharepoint(filename, document_bytes, URL, USERNAME, PASSWORD)
+
+    async def _debug_upload() -> None:
+        filename = str()
+        document_bytes = bytes()
+        async with async_playwright() as playwright:
+            browser = await playwright.chromium.launch(
+                headless=HEADLESS, args=BROWSER_LAUNCH_ARGS, chromium_sandbox=False
+            )
+            context, page = await prepare_sharepoint_page(browser, URL, USERNAME, PASSWORD)
+            await upload_document_to_sharepoint(page, filename, document_bytes)
+            await context.close()
+            await browser.close()
+
+    asyncio.run(_debug_upload())